@@ -23,6 +23,8 @@ with DAG(
         "raw_file_name": "teste_bees_rodrigo_amandio",
         "silver_path": "/opt/airflow/data/teste_bees/silver_data/",
         "gold_path": "/opt/airflow/data/teste_bees/gold_data/",
+        "gold_rollup_path": "/opt/airflow/data/teste_bees/gold_rollup_data/",
+        "gold_geo_path": "/opt/airflow/data/teste_bees/gold_geo_data/",
     },
 ) as dag:
 
@@ -55,7 +57,9 @@ with DAG(
             "PYTHONPATH=/opt/airflow/dags "
             "python3 /opt/airflow/dags/src/aggregation.py "
             "--silver_path {{ params.silver_path }} "
-            "--gold_path {{ params.gold_path }}"
+            "--gold_path {{ params.gold_path }} "
+            "--gold_rollup_path {{ params.gold_rollup_path }} "
+            "--gold_geo_path {{ params.gold_geo_path }}"
         ),
     )
 
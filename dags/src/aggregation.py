@@ -1,10 +1,24 @@
 import json
+import os
+import sys
 
 import pandas as pd
+from src.geo_index import build_spatial_index
 from utils.utils import get_arguments, logger, save_as_parquet
 
 logging = logger()
 
+# Every rollup level served by the gold layer, from the coarsest to the finest grain.
+# Each location prefix is computed with and without brewery_type.
+ROLLUP_LEVELS = {
+    "country": ["country"],
+    "country_brewery_type": ["country", "brewery_type"],
+    "country_state": ["country", "state"],
+    "country_state_brewery_type": ["country", "state", "brewery_type"],
+    "country_state_city": ["country", "state", "city"],
+    "country_state_city_brewery_type": ["country", "state", "city", "brewery_type"],
+}
+
 
 def read_data(path, logging):
 
@@ -29,36 +43,45 @@ def read_data(path, logging):
         return None
 
 
-def get_aggregated_data(df, logging):
+def get_rollup_data(df, logging):
     """
-    This function aggregates data by location (country, state and city) by count the type of
-    breweries for each one.
+    This function counts breweries for every level in ROLLUP_LEVELS with a single scan over
+    silver data, grouping-sets style.
+
+    Silver is grouped only once, at the finest grain. Coarser levels are summed from those
+    counts, which are orders of magnitude smaller than the silver DataFrame.
+
+    df: Dataframe with silver data
+
+    logging: Logging tool for observability (Monitoring)
+
+    Returns a dict {level name: DataFrame} or None if something fails.
     """
 
     try:
-        aggregated_total_breweries = (
-            df.groupby(
-                ["country", "state", "city", "brewery_type"]
-            )  # Group by location
-            .size()  # Count the number of rows in each group
-            .reset_index(
-                name="total_breweries_in_location"
-            )  # Name the new count column
-        )
+        finest_columns = ROLLUP_LEVELS["country_state_city_brewery_type"]
 
-        filtered_breweries_df = aggregated_total_breweries[
-            aggregated_total_breweries["total_breweries_in_location"] > 0
-        ]
+        finest_counts = df.groupby(finest_columns, observed=True).size()
+
+        rollups = {}
+
+        for level, columns in ROLLUP_LEVELS.items():
+            level_counts = finest_counts.groupby(level=columns, observed=True).sum()
+
+            rollups[level] = level_counts[level_counts > 0].reset_index(
+                name="total_breweries_in_location"
+            )
 
         logging.info(
             json.dumps(
                 {
-                    "Observability": f"Successfully aggregated dataframe by location (country, state and city) by count the type of breweries for each one."
+                    "Observability": "Successfully aggregated dataframe for every rollup level.",
+                    "Levels": list(rollups),
                 }
             )
         )
 
-        return filtered_breweries_df
+        return rollups
 
     except Exception as e:
         logging.error(
@@ -70,15 +93,60 @@ def get_aggregated_data(df, logging):
         return None
 
 
+def save_rollups(rollups, path, logging):
+    """
+    Saves each rollup level as its own gold table under path/<level name>, partitioned by
+    the location columns of that level.
+    """
+
+    for level, rollup_df in rollups.items():
+        partition_cols = [
+            column for column in ROLLUP_LEVELS[level] if column != "brewery_type"
+        ]
+
+        save_as_parquet(
+            rollup_df, os.path.join(path, level), logging, partition_cols=partition_cols
+        )
+
+
 if __name__ == "__main__":
 
     execution_variables = get_arguments(logging)
 
     silver_path = execution_variables.silver_path
     gold_path = execution_variables.gold_path
+    gold_rollup_path = execution_variables.gold_rollup_path
+    gold_geo_path = execution_variables.gold_geo_path
 
     brewery_silver_data = read_data(silver_path, logging)
 
-    filtered_breweries_df = get_aggregated_data(brewery_silver_data, logging)
+    rollups = get_rollup_data(brewery_silver_data, logging)
+
+    if rollups is None:
+        logging.error(
+            json.dumps({"Observability": "Gold layer not saved, aggregation failed"})
+        )
+
+        sys.exit(1)
+
+    # The finest level is the main gold table
+    filtered_breweries_df = rollups["country_state_city_brewery_type"]
 
     save_as_parquet(filtered_breweries_df, gold_path, logging)
+
+    if gold_rollup_path:
+        save_rollups(rollups, gold_rollup_path, logging)
+
+    if gold_geo_path:
+        spatial_index_df = build_spatial_index(brewery_silver_data, logging)
+
+        if spatial_index_df is None:
+            logging.error(
+                json.dumps(
+                    {"Observability": "Spatial index not saved, index build failed"}
+                )
+            )
+
+            sys.exit(1)
+
+        save_as_parquet(spatial_index_df, gold_geo_path, logging, partition_cols=[])
@@ -0,0 +1,260 @@
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+from utils.utils import get_arguments, logger
+
+logging = logger()
+
+# Side of each grid cell in degrees (~55 km in latitude)
+CELL_SIZE_DEGREES = 0.5
+
+EARTH_RADIUS_KM = 6371.0
+
+# Length of one degree along a great circle, consistent with haversine_km
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+# No two points on Earth are further apart than half its circumference
+MAX_DISTANCE_KM = np.pi * EARTH_RADIUS_KM
+
+INDEX_COLUMNS = ["id", "name", "brewery_type", "country", "state", "city"]
+
+
+def haversine_km(latitude, longitude, latitudes, longitudes):
+    """
+    Vectorized great-circle distance (km) from one point to arrays of points.
+    """
+
+    lat1, lon1 = np.radians(latitude), np.radians(longitude)
+    lat2, lon2 = np.radians(latitudes), np.radians(longitudes)
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def grid_cells(latitudes, longitudes, cell_size):
+    """
+    Fixed-grid cell of each point, as (cell_lat, cell_lon) integer arrays.
+    """
+
+    cell_lat = np.floor(np.asarray(latitudes) / cell_size).astype(int)
+    cell_lon = np.floor(np.asarray(longitudes) / cell_size).astype(int)
+
+    # Longitude 180 is the same meridian as -180
+    half_lon_cells = int(round(180 / cell_size))
+    cell_lon = np.where(cell_lon == half_lon_cells, -half_lon_cells, cell_lon)
+
+    return cell_lat, cell_lon
+
+
+def build_spatial_index(df, logging, cell_size=CELL_SIZE_DEGREES):
+    """
+    Builds the gold spatial index: one row per brewery with numeric coordinates and the
+    fixed-grid cell it belongs to, sorted by cell.
+
+    Silver stores coordinates as strings (e.g. "latitude not informed"), so they are cast
+    to float and breweries without valid coordinates are left out of the index.
+
+    df: Dataframe with silver data
+
+    logging: Logging tool for observability (Monitoring)
+    """
+
+    try:
+        index_df = df[INDEX_COLUMNS].copy()
+        index_df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
+        index_df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
+
+        valid_coordinates = index_df["latitude"].between(-90, 90) & index_df[
+            "longitude"
+        ].between(-180, 180)
+        index_df = index_df[valid_coordinates]
+
+        index_df["cell_lat"], index_df["cell_lon"] = grid_cells(
+            index_df["latitude"], index_df["longitude"], cell_size
+        )
+
+        index_df = index_df.sort_values(["cell_lat", "cell_lon"]).reset_index(drop=True)
+
+        logging.info(
+            json.dumps(
+                {
+                    "Observability": "Successfully built spatial index.",
+                    "IndexedBreweries": len(index_df),
+                    "SkippedBreweries": int((~valid_coordinates).sum()),
+                }
+            )
+        )
+
+        return index_df
+
+    except Exception as e:
+        logging.error(
+            json.dumps(
+                {"Observability": "An unexpected error occurred", "Error": str(e)}
+            )
+        )
+
+        return None
+
+
+class SpatialIndex:
+    """
+    In-memory grid over the gold spatial index. Radius and k-nearest queries only touch
+    the cells around the query point, then refine candidates with haversine distance.
+
+    Occupied cells are kept as numpy arrays, so selecting the cells around a point is a
+    vectorized filter whatever the search radius. Cells are recomputed from the
+    coordinates, so cell_size does not need to match the one used at build time.
+    """
+
+    def __init__(self, index_df, cell_size=CELL_SIZE_DEGREES):
+        self.df = index_df.reset_index(drop=True)
+        self.cell_size = cell_size
+        self.latitudes = self.df["latitude"].to_numpy(dtype=float)
+        self.longitudes = self.df["longitude"].to_numpy(dtype=float)
+        self.lon_cells = int(round(360 / cell_size))
+
+        row_cell_lat, row_cell_lon = grid_cells(
+            self.latitudes, self.longitudes, cell_size
+        )
+
+        # Row positions grouped by cell, and where each occupied cell starts in them
+        self.order = np.lexsort((row_cell_lon, row_cell_lat))
+        sorted_lat = row_cell_lat[self.order]
+        sorted_lon = row_cell_lon[self.order]
+
+        new_cell = np.ones(len(self.order), dtype=bool)
+        new_cell[1:] = (sorted_lat[1:] != sorted_lat[:-1]) | (
+            sorted_lon[1:] != sorted_lon[:-1]
+        )
+        self.cell_starts = np.flatnonzero(new_cell)
+        self.cell_counts = np.diff(np.append(self.cell_starts, len(self.order)))
+        self.cell_lats = sorted_lat[self.cell_starts]
+        self.cell_lons = sorted_lon[self.cell_starts]
+
+    @classmethod
+    def from_parquet(cls, path, cell_size=CELL_SIZE_DEGREES):
+        return cls(pd.read_parquet(path), cell_size=cell_size)
+
+    def _rows(self, selected_cells):
+        """
+        Row positions of every brewery in the selected cells (boolean mask over cells).
+        """
+
+        starts = self.cell_starts[selected_cells]
+        counts = self.cell_counts[selected_cells]
+        total = int(counts.sum())
+
+        # Expand each (start, count) into start, start + 1, ..., start + count - 1
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+
+        return self.order[offsets + np.arange(total)]
+
+    def _candidates(self, latitude, longitude, radius_km):
+        """
+        Row positions of every brewery in the cells overlapping the bounding box of the
+        circle around the query point.
+        """
+
+        lat_delta = radius_km / KM_PER_DEGREE
+        min_lat = max(latitude - lat_delta, -90.0)
+        max_lat = min(latitude + lat_delta, 90.0)
+
+        selected_cells = (self.cell_lats >= np.floor(min_lat / self.cell_size)) & (
+            self.cell_lats <= np.floor(max_lat / self.cell_size)
+        )
+
+        # Longitude degrees shrink towards the poles
+        widest_cos = np.cos(np.radians(max(abs(min_lat), abs(max_lat))))
+        if widest_cos > 1e-9 and lat_delta / widest_cos < 180:
+            lon_delta = lat_delta / widest_cos
+            first = int(np.floor((longitude - lon_delta) / self.cell_size))
+            last = int(np.floor((longitude + lon_delta) / self.cell_size))
+
+            # Cells are keyed within [-180, 180), so wrap around the antimeridian
+            selected_cells &= (self.cell_lons - first) % self.lon_cells <= last - first
+
+        return self._rows(selected_cells)
+
+    def _with_distance(self, positions, distances):
+        result = self.df.iloc[positions].copy()
+        result["distance_km"] = distances
+
+        return result.sort_values("distance_km").reset_index(drop=True)
+
+    def radius(self, latitude, longitude, radius_km):
+        """
+        Breweries within radius_km of the point, closest first.
+        """
+
+        positions = self._candidates(latitude, longitude, radius_km)
+        distances = haversine_km(
+            latitude, longitude, self.latitudes[positions], self.longitudes[positions]
+        )
+        within = distances <= radius_km
+
+        return self._with_distance(positions[within], distances[within])
+
+    def nearest(self, latitude, longitude, k):
+        """
+        The k breweries closest to the point.
+
+        The search radius grows from one cell until the cells around the point hold k
+        candidates. The k-th candidate distance then bounds a radius query, which also
+        picks up any closer brewery outside the searched cells.
+        """
+
+        if k <= 0 or self.df.empty:
+            return self._with_distance(np.empty(0, dtype=int), [])
+
+        k = min(k, len(self.df))
+
+        search_km = self.cell_size * KM_PER_DEGREE
+        positions = self._candidates(latitude, longitude, search_km)
+        while len(positions) < k:
+            # At MAX_DISTANCE_KM the bounding box covers the whole grid
+            search_km = min(search_km * 4, MAX_DISTANCE_KM)
+            positions = self._candidates(latitude, longitude, search_km)
+
+        distances = haversine_km(
+            latitude, longitude, self.latitudes[positions], self.longitudes[positions]
+        )
+        kth_distance = np.partition(distances, k - 1)[k - 1]
+
+        return self.radius(latitude, longitude, kth_distance).head(k)
+
+
+if __name__ == "__main__":
+
+    execution_variables = get_arguments(logging)
+
+    latitude = execution_variables.latitude
+    longitude = execution_variables.longitude
+
+    if latitude is None or longitude is None:
+        logging.error(
+            json.dumps(
+                {
+                    "Observability": "Error - --latitude and --longitude are required for spatial queries."
+                }
+            )
+        )
+
+        sys.exit(1)
+
+    spatial_index = SpatialIndex.from_parquet(execution_variables.gold_geo_path)
+
+    if execution_variables.radius_km is not None:
+        result = spatial_index.radius(
+            latitude, longitude, execution_variables.radius_km
+        )
+    else:
+        result = spatial_index.nearest(latitude, longitude, execution_variables.k)
+
+    print(result.to_string(index=False))
@@ -0,0 +1,196 @@
+import json
+import os
+import time
+from functools import lru_cache
+
+import pandas as pd
+from utils.utils import PUBLISH_MARKER, get_arguments, logger
+
+logging = logger()
+
+KEY_COLUMNS = ["country", "state", "city", "brewery_type"]
+
+COUNT_COLUMN = "total_breweries_in_location"
+
+
+def gold_signature(path):
+    """
+    Identifies a published gold build by the build id stored in its publish marker, which
+    save_as_parquet writes once every partition is saved. Raises OSError while no build
+    is published.
+    """
+
+    with open(os.path.join(path, PUBLISH_MARKER), "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_gold_counts(path, logging):
+    """
+    Loads the gold layer into a Series of brewery counts indexed by a sorted
+    (country, state, city, brewery_type) MultiIndex. Sorting allows point and prefix
+    lookups to be answered with binary searches instead of scans.
+    """
+
+    try:
+        df = pd.read_parquet(path, columns=KEY_COLUMNS + [COUNT_COLUMN])
+
+        # Partition columns come back as categoricals
+        for column in KEY_COLUMNS:
+            df[column] = df[column].astype(str)
+
+        counts = df.groupby(KEY_COLUMNS)[COUNT_COLUMN].sum().sort_index()
+
+        logging.info(
+            json.dumps(
+                {
+                    "Observability": f"Successfully loaded '{path}' into the gold query index.",
+                    "Keys": len(counts),
+                }
+            )
+        )
+
+        return counts
+
+    except Exception as e:
+        logging.error(
+            json.dumps(
+                {"Observability": "An unexpected error occurred", "Error": str(e)}
+            )
+        )
+
+        return None
+
+
+class GoldQueryService:
+    """
+    In-memory lookups of brewery counts over the gold layer, with an LRU result cache.
+
+    The gold directory is checked for a new build at most every reload_interval seconds.
+    When one is published, the index is reloaded and the cache is dropped. While a build is
+    being written, or if it cannot be read, the previous index keeps serving.
+    """
+
+    def __init__(self, path, logging, cache_size=4096, reload_interval=5.0):
+        self.path = path
+        self.logging = logging
+        self.cache_size = cache_size
+        self.reload_interval = reload_interval
+
+        self.counts = None
+        self.signature = None
+        self.checked_at = 0.0
+
+        self.reload()
+
+        if self.counts is None:
+            raise ValueError(f"Could not load gold data from '{path}'")
+
+    def reload(self):
+        """
+        Loads the gold build if it differs from the one being served.
+        """
+
+        self.checked_at = time.monotonic()
+
+        try:
+            signature = gold_signature(self.path)
+        except OSError:
+            return False
+
+        if signature == self.signature:
+            return False
+
+        counts = load_gold_counts(self.path, self.logging)
+
+        if counts is None:
+            return False
+
+        # A new build may have started while loading, leaving a partial directory
+        try:
+            if gold_signature(self.path) != signature:
+                return False
+        except OSError:
+            return False
+
+        self.counts = counts
+        self.signature = signature
+        self._cached_count = lru_cache(maxsize=self.cache_size)(self._count)
+
+        return True
+
+    def _maybe_reload(self):
+        if time.monotonic() - self.checked_at >= self.reload_interval:
+            self.reload()
+
+    @staticmethod
+    def _location(country, state, city):
+        if (city is not None and state is None) or (
+            state is not None and country is None
+        ):
+            raise ValueError("Location must be a prefix: country, state, then city")
+
+        return tuple(value for value in (country, state, city) if value is not None)
+
+    def _count(self, location, brewery_type):
+        if len(location) == len(KEY_COLUMNS) - 1 and brewery_type is not None:
+            return int(self.counts.get(location + (brewery_type,), 0))
+
+        try:
+            matches = self.counts.loc[location] if location else self.counts
+        except KeyError:
+            return 0
+
+        if brewery_type is not None:
+            types = matches.index.get_level_values(-1)
+            matches = matches[types == brewery_type]
+
+        return int(matches.sum())
+
+    def count(self, country=None, state=None, city=None, brewery_type=None):
+        """
+        Number of breweries for a location prefix (country, country+state or
+        country+state+city), optionally restricted to one brewery type.
+        """
+
+        location = self._location(country, state, city)
+
+        self._maybe_reload()
+
+        return self._cached_count(location, brewery_type)
+
+    def breakdown(self, country=None, state=None, city=None):
+        """
+        Brewery counts per key below a location prefix, as a DataFrame.
+        """
+
+        location = self._location(country, state, city)
+
+        self._maybe_reload()
+
+        try:
+            matches = self.counts.loc[location] if location else self.counts
+        except KeyError:
+            return pd.DataFrame(columns=KEY_COLUMNS + [COUNT_COLUMN])
+
+        # .loc drops the levels that were matched, so rebuild them as columns
+        result = matches.reset_index(name=COUNT_COLUMN)
+        for position, column in enumerate(KEY_COLUMNS[: len(location)]):
+            result.insert(position, column, location[position])
+
+        return result
+
+
+if __name__ == "__main__":
+
+    execution_variables = get_arguments(logging)
+
+    service = GoldQueryService(execution_variables.gold_path, logging)
+
+    total = service.count(
+        execution_variables.country,
+        execution_variables.state,
+        execution_variables.city,
+        execution_variables.brewery_type,
+    )
+
+    print(total)
@@ -5,6 +5,12 @@ import os
 import shutil
 import subprocess
 import sys
+import uuid
+
+PUBLISH_MARKER = "_SUCCESS"
+
+# pyarrow only needs to be installed once per process
+pyarrow_installed = False
 
 
 def logger():
@@ -18,9 +24,15 @@ def logger():
     return logger
 
 
-def save_as_parquet(df, path, logger):
+def save_as_parquet(df, path, logger, partition_cols=None):
+
+    global pyarrow_installed
+
+    # Location partitioning is the default for every layer
+    if partition_cols is None:
+        partition_cols = ["country", "state", "city"]
 
-    shutil.rmtree(path)
+    shutil.rmtree(path, ignore_errors=True)
 
     os.makedirs(path, exist_ok=True)
 
@@ -28,19 +40,29 @@ def save_as_parquet(df, path, logger):
     package_name = "pyarrow"
 
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", package_name])
+        if not pyarrow_installed:
+            subprocess.check_call(
+                [sys.executable, "-m", "pip", "install", package_name]
+            )
 
-        logger.info(
-            json.dumps({"Observability": f"Successfully installed {package_name}."})
-        )
+            pyarrow_installed = True
+
+            logger.info(
+                json.dumps({"Observability": f"Successfully installed {package_name}."})
+            )
 
         df.to_parquet(
             path=path,
             engine="pyarrow",
-            partition_cols=["country", "state", "city"],
+            partition_cols=partition_cols,
             index=False,
         )
 
+        # Publish marker with a unique build id, written last so readers never pick up a
+        # partial build. Parquet readers ignore files starting with "_".
+        with open(os.path.join(path, PUBLISH_MARKER), "w") as f:
+            f.write(uuid.uuid4().hex)
+
         logger.info(
             json.dumps(
                 {"Observability": "Successfully saved data as parquet", "Path": path}
@@ -49,7 +71,9 @@ def save_as_parquet(df, path, logger):
 
     except Exception as e:
         logger.error(
-            json.dumps({"Observability": "An unexpected error occurred", "Error": e})
+            json.dumps(
+                {"Observability": "An unexpected error occurred", "Error": str(e)}
+            )
         )
 
         sys.exit(1)
@@ -66,6 +90,32 @@ def get_arguments(logger):
         "--silver_path", required=False, help="Final path for silver layer"
     )
     parser.add_argument("--gold_path", required=False, help="Final path for gold layer")
+    parser.add_argument(
+        "--gold_rollup_path",
+        required=False,
+        help="Final path for gold rollup tables (one per aggregation level)",
+    )
+    parser.add_argument(
+        "--gold_geo_path", required=False, help="Final path for gold spatial index"
+    )
+    parser.add_argument(
+        "--latitude", required=False, type=float, help="Latitude of the query point"
+    )
+    parser.add_argument(
+        "--longitude", required=False, type=float, help="Longitude of the query point"
+    )
+    parser.add_argument(
+        "--radius_km", required=False, type=float, help="Search radius in kilometers"
+    )
+    parser.add_argument(
+        "--k", required=False, type=int, default=10, help="Number of nearest breweries"
+    )
+    parser.add_argument("--country", required=False, help="Country to look up")
+    parser.add_argument("--state", required=False, help="State to look up")
+    parser.add_argument("--city", required=False, help="City to look up")
+    parser.add_argument(
+        "--brewery_type", required=False, help="Brewery type to look up"
+    )
     args = parser.parse_args()
 
     logger.info(
@@ -8,11 +8,15 @@ import tempfile
 import unittest
 from unittest.mock import MagicMock, patch
 
+import numpy as np
 import pandas as pd
 
-from dags.src.aggregation import get_aggregated_data, read_data
+from dags.src.aggregation import ROLLUP_LEVELS, get_rollup_data, read_data
 from dags.src.extract_data import get_api_data, save_raw_data
+from dags.src.geo_index import SpatialIndex, build_spatial_index, haversine_km
+from dags.src.gold_query import GoldQueryService, load_gold_counts
 from dags.src.transformation import data_transformation, json_to_dataframe
+from dags.utils.utils import PUBLISH_MARKER, save_as_parquet
 
 
 class TestGetAPIData(unittest.TestCase):
@@ -184,7 +188,7 @@ class TestGetAPIData(unittest.TestCase):
         df = pd.DataFrame(data)
 
         # Run aggregation
-        result = get_aggregated_data(df, self.logger)
+        result = get_rollup_data(df, self.logger)["country_state_city_brewery_type"]
 
         # Expected output: counts of breweries grouped by location and type
         expected_data = {
@@ -207,6 +211,284 @@ class TestGetAPIData(unittest.TestCase):
         self.logger.info.assert_called_once()
         self.logger.error.assert_not_called()
 
+    def test_successful_rollup(self):
+        data = {
+            "country": ["US", "US", "US", "US", "BR"],
+            "state": ["CA", "CA", "NY", "NY", "SP"],
+            "city": ["LA", "LA", "NYC", "NYC", "Santos"],
+            "brewery_type": ["micro", "micro", "nano", "micro", "micro"],
+        }
+        df = pd.DataFrame(data)
+
+        rollups = get_rollup_data(df, self.logger)
+
+        self.assertEqual(set(rollups), set(ROLLUP_LEVELS))
+
+        by_country = rollups["country"].set_index("country")
+        self.assertEqual(by_country.loc["US", "total_breweries_in_location"], 4)
+        self.assertEqual(by_country.loc["BR", "total_breweries_in_location"], 1)
+
+        by_state_type = rollups["country_state_brewery_type"].set_index(
+            ["country", "state", "brewery_type"]
+        )
+        self.assertEqual(
+            by_state_type.loc[("US", "NY", "micro"), "total_breweries_in_location"], 1
+        )
+
+        # Every level accounts for all breweries
+        for rollup_df in rollups.values():
+            self.assertEqual(rollup_df["total_breweries_in_location"].sum(), len(df))
+
+        self.logger.error.assert_not_called()
+
+    def test_rollup_missing_columns(self):
+        df = pd.DataFrame({"country": ["US"]})
+
+        rollups = get_rollup_data(df, self.logger)
+
+        self.assertIsNone(rollups)
+        self.logger.error.assert_called_once()
+
+
+class TestSpatialIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+
+        # Random breweries, plus a few around the antimeridian and a missing coordinate
+        rng = np.random.default_rng(42)
+        latitudes = list(rng.uniform(-60, 70, 500).round(6)) + [10.0, 10.1, 0.0]
+        longitudes = list(rng.uniform(-180, 180, 500).round(6)) + [179.9, -179.9, 0.0]
+        latitudes = [str(value) for value in latitudes]
+        longitudes = [str(value) for value in longitudes]
+        latitudes[-1] = "latitude not informed"
+
+        size = len(latitudes)
+        self.silver_df = pd.DataFrame(
+            {
+                "id": [f"brewery-{i}" for i in range(size)],
+                "name": [f"Brewery {i}" for i in range(size)],
+                "brewery_type": ["micro"] * size,
+                "country": ["United States"] * size,
+                "state": ["New York"] * size,
+                "city": ["New York"] * size,
+                "latitude": latitudes,
+                "longitude": longitudes,
+            }
+        )
+
+        self.index_df = build_spatial_index(self.silver_df, self.logger)
+        self.spatial_index = SpatialIndex(self.index_df)
+
+    def brute_force(self, latitude, longitude):
+        distances = haversine_km(
+            latitude,
+            longitude,
+            self.index_df["latitude"].to_numpy(),
+            self.index_df["longitude"].to_numpy(),
+        )
+        return self.index_df.assign(distance_km=distances).sort_values("distance_km")
+
+    def test_build_spatial_index(self):
+        self.assertEqual(len(self.index_df), len(self.silver_df) - 1)
+        self.assertTrue(pd.api.types.is_float_dtype(self.index_df["latitude"]))
+        self.assertIn("cell_lat", self.index_df.columns)
+        self.assertIn("cell_lon", self.index_df.columns)
+        self.logger.error.assert_not_called()
+
+    def test_haversine_known_distance(self):
+        # One degree of latitude is about 111 km
+        distance = haversine_km(0.0, 0.0, np.array([1.0]), np.array([0.0]))[0]
+        self.assertAlmostEqual(distance, 111.195, places=2)
+
+    def test_radius_matches_brute_force(self):
+        for latitude, longitude, radius_km in [
+            (10.0, 179.95, 50),
+            (40.0, -74.0, 1500),
+            (-30.0, 20.0, 800),
+        ]:
+            expected = self.brute_force(latitude, longitude)
+            expected = expected[expected["distance_km"] <= radius_km]
+
+            result = self.spatial_index.radius(latitude, longitude, radius_km)
+
+            self.assertEqual(set(result["id"]), set(expected["id"]))
+            self.assertTrue(result["distance_km"].is_monotonic_increasing)
+
+    def test_radius_crosses_antimeridian(self):
+        result = self.spatial_index.radius(10.0, 179.95, 50)
+
+        self.assertIn("brewery-500", set(result["id"]))
+        self.assertIn("brewery-501", set(result["id"]))
+
+    def test_nearest_matches_brute_force(self):
+        for latitude, longitude, k in [(10.0, 179.95, 2), (40.0, -74.0, 7), (85, 0, 3)]:
+            expected = self.brute_force(latitude, longitude).head(k)
+
+            result = self.spatial_index.nearest(latitude, longitude, k)
+
+            self.assertEqual(len(result), k)
+            np.testing.assert_allclose(
+                result["distance_km"].to_numpy(), expected["distance_km"].to_numpy()
+            )
+
+    def test_radius_includes_point_on_cell_edge(self):
+        # Due north of the query point, exactly one cell away
+        edge_index = SpatialIndex(
+            pd.DataFrame({"id": ["edge"], "latitude": [0.5], "longitude": [0.25]})
+        )
+        distance = haversine_km(0.0, 0.25, np.array([0.5]), np.array([0.25]))[0]
+
+        result = edge_index.radius(0.0, 0.25, distance)
+
+        self.assertEqual(result["id"].tolist(), ["edge"])
+
+    def test_cell_size_independent_of_build(self):
+        coarse_index = SpatialIndex(self.index_df, cell_size=5.0)
+
+        for latitude, longitude in [(10.0, 179.95), (40.0, -74.0), (-40.0, 100.0)]:
+            expected = self.brute_force(latitude, longitude)
+
+            radius_result = coarse_index.radius(latitude, longitude, 1000)
+            self.assertEqual(
+                set(radius_result["id"]),
+                set(expected[expected["distance_km"] <= 1000]["id"]),
+            )
+
+            nearest_result = coarse_index.nearest(latitude, longitude, 5)
+            np.testing.assert_allclose(
+                nearest_result["distance_km"].to_numpy(),
+                expected["distance_km"].head(5).to_numpy(),
+            )
+
+    def test_nearest_more_than_catalogue(self):
+        result = self.spatial_index.nearest(0.0, 0.0, 10_000)
+
+        self.assertEqual(len(result), len(self.index_df))
+
+    def test_build_spatial_index_missing_columns(self):
+        result = build_spatial_index(pd.DataFrame({"id": [1]}), self.logger)
+
+        self.assertIsNone(result)
+        self.logger.error.assert_called_once()
+
+
+class TestGoldQueryService(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = MagicMock()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.gold_path = os.path.join(self.tmp_dir.name, "gold")
+
+        self.publish(
+            {
+                "country": ["US", "US", "US", "BR"],
+                "state": ["CA", "NY", "NY", "SP"],
+                "city": ["LA", "NYC", "NYC", "Santos"],
+                "brewery_type": ["micro", "nano", "micro", "micro"],
+                "total_breweries_in_location": [2, 1, 3, 5],
+            }
+        )
+
+        self.service = GoldQueryService(self.gold_path, self.logger, reload_interval=0)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    @patch("dags.utils.utils.subprocess.check_call")
+    def publish(self, data, mock_check_call):
+        # The real writer, so the publish marker used by hot reload is covered too
+        save_as_parquet(pd.DataFrame(data), self.gold_path, self.logger)
+
+    def test_point_lookup(self):
+        self.assertEqual(self.service.count("US", "NY", "NYC", "micro"), 3)
+        self.assertEqual(self.service.count("US", "NY", "NYC", "brewpub"), 0)
+
+    def test_prefix_lookup(self):
+        self.assertEqual(self.service.count(), 11)
+        self.assertEqual(self.service.count("US"), 6)
+        self.assertEqual(self.service.count("US", "NY"), 4)
+        self.assertEqual(self.service.count("US", brewery_type="micro"), 5)
+        self.assertEqual(self.service.count("AR"), 0)
+
+    def test_invalid_prefix(self):
+        with self.assertRaises(ValueError):
+            self.service.count(state="NY")
+
+    def test_breakdown(self):
+        result = self.service.breakdown("US", "NY")
+
+        self.assertEqual(
+            result.columns.tolist(),
+            ["country", "state", "city", "brewery_type", "total_breweries_in_location"],
+        )
+        self.assertEqual(result["total_breweries_in_location"].sum(), 4)
+        self.assertTrue(self.service.breakdown("AR").empty)
+
+    def test_results_are_cached(self):
+        self.service.count("US")
+        self.service.count("US")
+
+        self.assertEqual(self.service._cached_count.cache_info().hits, 1)
+
+    def test_hot_reload_on_new_build(self):
+        self.assertEqual(self.service.count("US"), 6)
+
+        self.publish(
+            {
+                "country": ["US"],
+                "state": ["CA"],
+                "city": ["LA"],
+                "brewery_type": ["micro"],
+                "total_breweries_in_location": [10],
+            }
+        )
+
+        self.assertEqual(self.service.count("US"), 10)
+        self.assertEqual(self.service.count("BR"), 0)
+
+    def test_keeps_serving_while_build_is_written(self):
+        os.remove(os.path.join(self.gold_path, PUBLISH_MARKER))
+
+        self.assertEqual(self.service.count("US"), 6)
+
+    def test_publish_marker_identifies_build(self):
+        marker_path = os.path.join(self.gold_path, PUBLISH_MARKER)
+        with open(marker_path, "r", encoding="utf-8") as f:
+            first_build = f.read()
+
+        self.publish({"country": ["US"], "state": ["CA"], "city": ["LA"]})
+
+        with open(marker_path, "r", encoding="utf-8") as f:
+            self.assertNotEqual(f.read(), first_build)
+
+    def test_ignores_build_replaced_while_loading(self):
+        def new_build_starts(path, logging):
+            counts = load_gold_counts(path, logging)
+            os.remove(os.path.join(path, PUBLISH_MARKER))
+            return counts
+
+        self.publish(
+            {
+                "country": ["US"],
+                "state": ["CA"],
+                "city": ["LA"],
+                "brewery_type": ["micro"],
+                "total_breweries_in_location": [10],
+            }
+        )
+
+        with patch(
+            "dags.src.gold_query.load_gold_counts", side_effect=new_build_starts
+        ):
+            self.assertFalse(self.service.reload())
+
+        self.assertEqual(self.service.count("US"), 6)
+
+    def test_unpublished_gold(self):
+        with self.assertRaises(ValueError):
+            GoldQueryService(os.path.join(self.tmp_dir.name, "missing"), self.logger)
+
 
 if __name__ == "__main__":
     unittest.main()